@@ -1,6 +1,12 @@
+import hashlib
+import io
+
+import requests
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
 # --------------------------------------------------
 # Page setup
@@ -31,6 +37,9 @@ KNOWN_DATA = [
     {"name": "Viktor Gyökeres", "PWR": 97, "Speed": 99, "Shoot": 96, "Dribble": 93, "Pass": 87, "Defend": 79, "Explosiveness": 95, "target": 98.13}
 ]
 
+# Targets indexed by player name, for the verification lookup
+KNOWN_TARGETS = pd.Series({player["name"]: player["target"] for player in KNOWN_DATA}, name="Target")
+
 
 # --------------------------------------------------
 # Reverse engineered weights (calculated from your data)
@@ -49,35 +58,130 @@ OPTIMAL_WEIGHTS = {
 # Total multiplier (should be around 1.055)
 TOTAL_MULTIPLIER = sum(OPTIMAL_WEIGHTS.values())
 
+# Goalkeeper weights (adjust these based on your GK data)
+GK_WEIGHTS = {
+    "PWR": 0.40,
+    "Goalkeeping": 0.30,
+    "Explosiveness": 0.15,
+    "Speed": 0.15
+}
+
+# Stat columns read by the formula terms below
+STAT_COLS = [
+    "PWR",
+    "Speed",
+    "Shoot",
+    "Dribble",
+    "Pass",
+    "Defend",
+    "Explosiveness",
+    "Goalkeeping"
+]
+
+# Low-cardinality label columns, stored as pandas categoricals
+CATEGORY_COLS = [
+    "Pos",
+    "Rarity",
+    "Nationality",
+    "Season"
+]
+
+# Formula terms as (STAT_COLS index, weight), in the order the weights
+# are listed. Scores add them up in exactly that order in float64, so
+# they round to the same two decimals as the original per-player sum
+OUTFIELD_TERMS = [(STAT_COLS.index(col), np.float64(weight)) for col, weight in OPTIMAL_WEIGHTS.items()]
+GK_TERMS = [(STAT_COLS.index(col), np.float64(weight)) for col, weight in GK_WEIGHTS.items()]
+
 
 # --------------------------------------------------
-# Load data
+# Display columns (load_data guarantees every STAT_COLS column exists)
+# --------------------------------------------------
+DISPLAY_COLS = [
+    "Rank",
+    "Power Ranking",
+    "Name",
+    "Pos",
+    "Nationality",
+    "Rarity",
+    "Season"
+] + STAT_COLS
+
+# Number formats applied client-side by st.dataframe, shared by every table
+COLUMN_CONFIG = {
+    "Power Ranking": st.column_config.NumberColumn(format="%.2f"),
+    **{col: st.column_config.NumberColumn(format="%d") for col in STAT_COLS},
+    "Calculated": st.column_config.NumberColumn(format="%.2f"),
+    "Target": st.column_config.NumberColumn(format="%.2f"),
+    "Difference": st.column_config.NumberColumn(format="%+.2f")
+}
+
+GRADIENT_COLS = ["Power Ranking"]
+
+TOP5_COLS = ["Rank", "Name", "PWR", "Explosiveness", "Shoot", "Speed", "Power Ranking"]
+
+
+# --------------------------------------------------
+# Fetch CSV (conditional GET)
 # --------------------------------------------------
+@st.cache_resource
+def csv_store():
+    """Last ETag and body seen for GITHUB_CSV, shared across reruns."""
+    return {"etag": None, "version": None, "content": None}
+
+
 @st.cache_data(ttl=60)
-def load_data():
+def fetch_csv():
+    """
+    Download GITHUB_CSV at most once a minute, sending the last ETag so
+    an unchanged file comes back as an empty 304 instead of the full body.
+
+    Returns (version, content). The version is the ETag, or a hash of
+    the content when the server sends none, and keys the caches below.
+    """
+
+    store = csv_store()
+    headers = {"If-None-Match": store["etag"]} if store["etag"] else {}
 
-    df = pd.read_csv(GITHUB_CSV)
+    response = requests.get(GITHUB_CSV, headers=headers, timeout=10)
+    if response.status_code != 304:
+        response.raise_for_status()
+        store["etag"] = response.headers.get("ETag")
+        store["version"] = store["etag"] or hashlib.sha256(response.content).hexdigest()
+        store["content"] = response.content
 
-    numeric_cols = [
-        "PWR",
-        "Speed",
-        "Shoot",
-        "Dribble",
-        "Pass",
-        "Defend",
-        "Explosiveness",
-        "Goalkeeping"
-    ]
+    return store["version"], store["content"]
 
-    for col in numeric_cols:
 
+# --------------------------------------------------
+# Load data
+# --------------------------------------------------
+def load_data(content):
+
+    # pyarrow parses multi-threaded straight from the downloaded bytes.
+    # No dtype= map here: with the pyarrow engine pandas applies it as a
+    # whole-frame astype, which fails on integer stat columns with blanks
+    df = pd.read_csv(io.BytesIO(content), engine="pyarrow")
+
+    for col in STAT_COLS:
         if col not in df.columns:
             df[col] = 0
 
-        df[col] = pd.to_numeric(
-            df[col],
-            errors="coerce"
-        ).fillna(0)
+    # pyarrow already types clean stat columns as numbers; only columns
+    # that came back as text (stray values in the sheet) need coercing
+    text_cols = df[STAT_COLS].select_dtypes(exclude="number").columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].apply(pd.to_numeric, errors="coerce")
+
+    # Ratings are small integers; float32 halves the bytes of every
+    # downstream pass compared to float64
+    df[STAT_COLS] = df[STAT_COLS].fillna(0).astype(np.float32)
+
+    # Categorical codes make isin/unique/== integer operations
+    for col in CATEGORY_COLS:
+        df[col] = df[col].astype("category")
+
+    # Arrow-backed names keep the verification lookup off Python objects
+    df["Name"] = df["Name"].astype("string[pyarrow]")
 
     return df
 
@@ -85,7 +189,7 @@ def load_data():
 # --------------------------------------------------
 # Power Ranking formula with optimized weights
 # --------------------------------------------------
-def compute_power_ranking(row):
+def compute_power_ranking(df):
     """
     Formula reverse engineered from your data:
     PWR: 45.4%
@@ -96,53 +200,150 @@ def compute_power_ranking(row):
     Defend: 9.6%
     Explosiveness: 10.5%
     Total multiplier: ~105.5%
+
+    Goalkeepers use GK_WEIGHTS instead. Each formula is evaluated
+    column by column over its own rows only.
     """
-    
-    if row["Pos"] == "GK":
-        # For goalkeepers, use a specialized formula
-        # You can adjust these weights based on your GK data
-        power_ranking = (
-            row["PWR"] * 0.40 +
-            row["Goalkeeping"] * 0.30 +
-            row["Explosiveness"] * 0.15 +
-            row["Speed"] * 0.15
-        )
-    else:
-        # Outfield Player Formula - optimized weights
-        power_ranking = (
-            row["PWR"] * OPTIMAL_WEIGHTS["PWR"] +
-            row["Speed"] * OPTIMAL_WEIGHTS["Speed"] +
-            row["Shoot"] * OPTIMAL_WEIGHTS["Shoot"] +
-            row["Dribble"] * OPTIMAL_WEIGHTS["Dribble"] +
-            row["Pass"] * OPTIMAL_WEIGHTS["Pass"] +
-            row["Defend"] * OPTIMAL_WEIGHTS["Defend"] +
-            row["Explosiveness"] * OPTIMAL_WEIGHTS["Explosiveness"]
-        )
-    
-    return round(power_ranking, 2)
+
+    # Column-major, as pandas stores a block: each stat is one contiguous run
+    stats = df[STAT_COLS].to_numpy()
+    is_gk = (df["Pos"] == "GK").to_numpy()
+    gk_idx = np.flatnonzero(is_gk)
+    out_idx = np.flatnonzero(~is_gk)
+
+    power_ranking = np.empty(len(df), dtype=np.float64)
+    power_ranking[gk_idx] = weighted_sum(stats, gk_idx, GK_TERMS)
+    power_ranking[out_idx] = weighted_sum(stats, out_idx, OUTFIELD_TERMS)
+
+    # np.round scales by 100 before rounding. Where that product lands
+    # exactly on a half cent it can round the other way than round(x, 2)
+    # on the true sum, so only those few scores are re-rounded one by one
+    scaled = power_ranking * 100
+    halves = np.flatnonzero(scaled - np.floor(scaled) == 0.5)
+    exact = power_ranking[halves].tolist()
+
+    # Round once over the whole column, in place
+    np.round(power_ranking, 2, out=power_ranking)
+    power_ranking[halves] = [round(value, 2) for value in exact]
+
+    return power_ranking
+
+
+def weighted_sum(stats, rows, terms):
+    """Sum stat * weight for each term over rows, column by column, in float64."""
+
+    total = np.zeros(len(rows), dtype=np.float64)
+    for col, weight in terms:
+        total += stats[rows, col] * weight
+
+    return total
 
 
 # --------------------------------------------------
-# Load and compute
+# Ranking helper
 # --------------------------------------------------
-df = load_data()
+def rank_descending(values):
+    """
+    Competition ranks for values, highest first.
+    Same result as Series.rank(ascending=False, method="min")
+    using one argsort and a scatter.
 
-# Apply the formula
-df["Power Ranking"] = df.apply(
-    compute_power_ranking,
-    axis=1
-)
+    Also returns the sort order so callers can reorder rows
+    without sorting a second time.
+    """
+
+    order = np.argsort(-values, kind="stable")
+    sorted_values = values[order]
+
+    # A new rank starts wherever the value changes; ties keep the first position
+    is_new = np.ones(len(values), dtype=bool)
+    is_new[1:] = sorted_values[1:] != sorted_values[:-1]
+    positions = np.arange(1, len(values) + 1)
+
+    ranks = np.empty(len(values), dtype=int)
+    ranks[order] = np.maximum.accumulate(np.where(is_new, positions, 0))
+
+    return order, ranks
+
+
+# --------------------------------------------------
+# Table styling
+# --------------------------------------------------
+@st.cache_resource
+def gradient_lut():
+    """
+    CSS for each of the 256 RdYlGn colors, built once per process.
+    Text turns light on dark cells, using the same luminance rule as
+    Styler.background_gradient.
+    """
+
+    # Imported on first use so cold starts don't pay for matplotlib up front
+    import matplotlib
+
+    cmap = matplotlib.colormaps["RdYlGn"]
+    rgba = cmap(np.arange(cmap.N))[:, :3]
+    rgb = np.round(rgba * 255).astype(int)
+
+    linear = np.where(rgba <= 0.04045, rgba / 12.92, ((rgba + 0.055) / 1.055) ** 2.4)
+    dark = linear @ np.array([0.2126, 0.7152, 0.0722]) < 0.408
+
+    return np.array([
+        f"background-color: #{r:02x}{g:02x}{b:02x};color: {'#f1f1f1' if is_dark else '#000000'};"
+        for (r, g, b), is_dark in zip(rgb, dark)
+    ])
+
+
+def gradient_css(values, vmin, vmax):
+    """
+    Cell styles matching Styler.background_gradient(cmap="RdYlGn",
+    vmin=vmin, vmax=vmax), as one normalization and one lookup into
+    gradient_lut().
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    normed = (values - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(values)
+
+    lut = gradient_lut()
+    return lut[np.clip((normed * len(lut)).astype(int), 0, len(lut) - 1)]
+
+
+# --------------------------------------------------
+# Load, compute and rank (cached across reruns)
+# --------------------------------------------------
+# Keyed on the CSV version only (_content is not hashed), so an
+# unchanged file is parsed and ranked once instead of once per minute
+@st.cache_data(max_entries=2)
+def load_ranked(version, _content):
+
+    df = load_data(_content)
+
+    # Apply the formula
+    df["Power Ranking"] = compute_power_ranking(df)
+
+    # Ranking
+    order, ranks = rank_descending(df["Power Ranking"].to_numpy())
+    df["Rank"] = ranks
+
+    # Reuse the ranking sort order instead of a second sort_values("Rank")
+    return df.take(order)
 
 
 # --------------------------------------------------
-# Ranking
+# CSV export
 # --------------------------------------------------
-df["Rank"] = df["Power Ranking"].rank(
-    ascending=False,
-    method="min"
-).astype(int)
+# Keyed on the CSV version; the ranked frame (_df) is not hashed
+@st.cache_data(max_entries=2)
+def to_csv_bytes(version, _df):
+
+    # Arrow's CSV writer serializes whole columns in C++
+    buffer = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(_df, preserve_index=False), buffer)
+
+    return buffer.getvalue()
 
-df = df.sort_values("Rank")
+
+csv_version, csv_content = fetch_csv()
+df = load_ranked(csv_version, csv_content)
 
 
 # --------------------------------------------------
@@ -168,12 +369,12 @@ st.sidebar.subheader("🔍 Filters")
 
 pos_filter = st.sidebar.multiselect(
     "Position",
-    sorted(df["Pos"].unique())
+    df["Pos"].cat.categories.tolist()
 )
 
 rarity_filter = st.sidebar.multiselect(
     "Rarity",
-    sorted(df["Rarity"].unique())
+    df["Rarity"].cat.categories.tolist()
 )
 
 # Display options
@@ -194,17 +395,19 @@ if total_players > 0:
 else:
     max_rows = 10
 
-# Apply filters
-filtered_df = df.copy()
-if pos_filter:
-    filtered_df = filtered_df[filtered_df["Pos"].isin(pos_filter)]
+# Apply filters as one combined mask and show the top N players
+# (df is already sorted, so one gather does filter + head)
+if pos_filter or rarity_filter:
+    mask = np.ones(len(df), dtype=bool)
+    if pos_filter:
+        mask &= df["Pos"].isin(pos_filter).to_numpy()
 
-if rarity_filter:
-    filtered_df = filtered_df[filtered_df["Rarity"].isin(rarity_filter)]
+    if rarity_filter:
+        mask &= df["Rarity"].isin(rarity_filter).to_numpy()
 
-# Show top N players
-display_count = min(max_rows, len(filtered_df))
-filtered_df = filtered_df.head(display_count)
+    filtered_df = df.iloc[np.flatnonzero(mask)[:max_rows]]
+else:
+    filtered_df = df.iloc[:max_rows]
 
 
 # --------------------------------------------------
@@ -212,39 +415,41 @@ filtered_df = filtered_df.head(display_count)
 # --------------------------------------------------
 st.header("✅ Formula Verification")
 
-# Create verification dataframe
-verification_data = []
-for player in KNOWN_DATA:
-    player_row = df[df["Name"] == player["name"]]
-    if not player_row.empty:
-        calculated = player_row["Power Ranking"].values[0]
-        verification_data.append({
-            "Player": player["name"],
-            "Calculated": calculated,
-            "Target": player["target"],
-            "Difference": calculated - player["target"],
-            "Match": abs(calculated - player["target"]) < 0.1
-        })
-
-if verification_data:
-    verification_df = pd.DataFrame(verification_data)
-    
-    # Style the verification table
-    def color_difference(val):
-        if abs(val) < 0.1:
-            return 'background-color: #90EE90'  # Green
-        elif abs(val) < 0.5:
-            return 'background-color: #FFFF99'  # Yellow
-        else:
-            return 'background-color: #FFB6C6'  # Red
+# One pass finds the known players; the rest of the section is skipped
+# when the sheet has none of them
+known_mask = df["Name"].isin(KNOWN_TARGETS.index).to_numpy()
+
+if known_mask.any():
+    # Look up the known players with one indexed reindex
+    # (the highest-ranked row wins on duplicate names)
+    power_by_name = (
+        df.loc[known_mask, ["Name", "Power Ranking"]]
+        .drop_duplicates("Name")
+        .set_index("Name")["Power Ranking"]
+    )
+
+    # Create verification dataframe from the aligned columns
+    verification_df = (
+        pd.concat([power_by_name.reindex(KNOWN_TARGETS.index).rename("Calculated"), KNOWN_TARGETS], axis=1)
+        .dropna(subset=["Calculated"])
+        .rename_axis("Player")
+        .reset_index()
+    )
+    verification_df["Difference"] = verification_df["Calculated"] - verification_df["Target"]
+    verification_df["Match"] = verification_df["Difference"].abs() < 0.1
+
+    # Style the verification table (one call for the whole column)
+    def color_difference(col):
+        diff = col.abs().to_numpy()
+        return np.select(
+            [diff < 0.1, diff < 0.5],
+            ['background-color: #90EE90', 'background-color: #FFFF99'],  # Green, Yellow
+            'background-color: #FFB6C6'  # Red
+        )
     
-    styled_verification = verification_df.style.format({
-        "Calculated": "{:.2f}",
-        "Target": "{:.2f}",
-        "Difference": "{:+.2f}"
-    }).map(color_difference, subset=["Difference"])
+    styled_verification = verification_df.style.apply(color_difference, subset=["Difference"])
     
-    st.dataframe(styled_verification, use_container_width=True)
+    st.dataframe(styled_verification, column_config=COLUMN_CONFIG, use_container_width=True)
     
     # Calculate accuracy
     matches = verification_df["Match"].sum()
@@ -264,27 +469,6 @@ else:
 # --------------------------------------------------
 st.header("📊 Player Power Rankings")
 
-display_cols = [
-    "Rank",
-    "Power Ranking",
-    "Name",
-    "Pos",
-    "Nationality",
-    "Rarity",
-    "Season",
-    "PWR",
-    "Speed",
-    "Shoot",
-    "Dribble",
-    "Pass",
-    "Defend",
-    "Explosiveness"
-]
-
-# Add Goalkeeping column if it exists
-if "Goalkeeping" in df.columns:
-    display_cols.append("Goalkeeping")
-
 # Display stats
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -299,43 +483,28 @@ with col3:
 
 # Format and display
 if len(filtered_df) > 0:
-    format_dict = {
-        "Power Ranking": "{:.2f}",
-        "PWR": "{:.0f}",
-        "Speed": "{:.0f}",
-        "Shoot": "{:.0f}",
-        "Dribble": "{:.0f}",
-        "Pass": "{:.0f}",
-        "Defend": "{:.0f}",
-        "Explosiveness": "{:.0f}"
-    }
-    
-    # Add Goalkeeping to format dict if it exists
-    if "Goalkeeping" in filtered_df.columns:
-        format_dict["Goalkeeping"] = "{:.0f}"
-    
-    styled = filtered_df[display_cols].style.format(format_dict).background_gradient(
-        subset=["Power Ranking"],
-        cmap="RdYlGn"
+    # Color against the full table's range so colors don't shift with the
+    # filters; df is sorted by Power Ranking, so that is its last and first row
+    styled = filtered_df[DISPLAY_COLS].style.apply(
+        gradient_css,
+        subset=GRADIENT_COLS,
+        vmin=df["Power Ranking"].iat[-1],
+        vmax=df["Power Ranking"].iat[0]
     )
 
     st.dataframe(
         styled,
+        column_config=COLUMN_CONFIG,
         use_container_width=True,
         height=600
     )
     
     # Show top 5 players with their key stats
     st.subheader("🏆 Top 5 Players")
-    top5 = filtered_df.head(5)[["Rank", "Name", "PWR", "Explosiveness", "Shoot", "Speed", "Power Ranking"]].copy()
+    top5 = filtered_df.head(5)[TOP5_COLS]
     st.dataframe(
-        top5.style.format({
-            "Power Ranking": "{:.2f}",
-            "PWR": "{:.0f}",
-            "Explosiveness": "{:.0f}",
-            "Shoot": "{:.0f}",
-            "Speed": "{:.0f}"
-        }),
+        top5,
+        column_config=COLUMN_CONFIG,
         use_container_width=True
     )
     
@@ -347,11 +516,9 @@ st.caption(f"⚡ Using reverse engineered formula: PWR(45.4%) + Speed(9.8%) + Sh
 st.caption(f"📁 Live data from GitHub main branch | Updated automatically every minute")
 
 # Add download button
-if st.button("📥 Download Full Rankings as CSV"):
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="Click to Download",
-        data=csv,
-        file_name="player_power_rankings.csv",
-        mime="text/csv"
-    )
+st.download_button(
+    label="📥 Download Full Rankings as CSV",
+    data=to_csv_bytes(csv_version, df),
+    file_name="player_power_rankings.csv",
+    mime="text/csv"
+)
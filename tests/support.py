@@ -0,0 +1,57 @@
+"""Helpers for running main.py against a mocked players.csv download."""
+
+import importlib.util
+import sys
+from pathlib import Path
+from unittest import mock
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "main.py")
+
+HEADER = "Name,Pos,Nationality,Rarity,Season,PWR,Speed,Shoot,Dribble,Pass,Defend,Explosiveness,Goalkeeping"
+
+
+def sheet(*rows):
+    """players.csv bytes: the usual header followed by rows."""
+    return "\n".join((HEADER, *rows)).encode() + b"\n"
+
+
+def response(content=b"", status_code=200, etag=None):
+    """Stand-in for the requests.Response that fetch_csv reads."""
+    reply = mock.Mock(status_code=status_code, content=content, headers={"ETag": etag} if etag else {})
+    reply.raise_for_status.return_value = None
+    return reply
+
+
+def clear_caches():
+    """Streamlit caches are process-wide; start each test from a cold load."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_app(csv):
+    """Run main.py headless with csv served as players.csv."""
+    with mock.patch("requests.get", return_value=response(csv)):
+        return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def load_main():
+    """
+    main.py as a module, so tests can call its functions directly.
+
+    Imported once, in Streamlit's bare mode, with a one-player sheet
+    standing in for the download the script makes at import time.
+    """
+
+    module = sys.modules.get("main")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("main", APP)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["main"] = module
+        csv = sheet("Luis Diaz,FW,Colombia,Mythical,The Choice,100,100,99,99,91,70,101,0")
+        with mock.patch("requests.get", return_value=response(csv)):
+            spec.loader.exec_module(module)
+
+    return module
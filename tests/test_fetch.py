@@ -0,0 +1,38 @@
+import hashlib
+import unittest
+from unittest import mock
+
+from tests.support import clear_caches, load_main, response, sheet
+
+main = load_main()
+
+CSV = sheet("Luis Diaz,FW,Colombia,Mythical,The Choice,100,100,99,99,91,70,101,0")
+
+
+class FetchCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_not_modified_reuses_stored_body(self):
+        replies = [response(CSV, etag='"v1"'), response(status_code=304)]
+        with mock.patch("requests.get", side_effect=replies) as get:
+            first = main.fetch_csv()
+            main.fetch_csv.clear()  # as if the one-minute ttl had run out
+            second = main.fetch_csv()
+
+        self.assertEqual(first, ('"v1"', CSV))
+        self.assertEqual(second, ('"v1"', CSV))
+        self.assertEqual(get.call_args_list[0].kwargs["headers"], {})
+        self.assertEqual(get.call_args_list[1].kwargs["headers"], {"If-None-Match": '"v1"'})
+
+    def test_version_falls_back_to_content_hash(self):
+        with mock.patch("requests.get", return_value=response(CSV)):
+            version, content = main.fetch_csv()
+
+        self.assertEqual(version, hashlib.sha256(CSV).hexdigest())
+        self.assertEqual(content, CSV)
+
+
+if __name__ == "__main__":
+    unittest.main()
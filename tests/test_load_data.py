@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tests.support import clear_caches, run_app, sheet
+
+# Blank stat cells: an outfielder with no Goalkeeping, a keeper with no Speed
+CSV = sheet(
+    "Luis Diaz,FW,Colombia,Mythical,The Choice,100,100,99,99,91,70,101,",
+    "Alisson,GK,Brazil,Legendary,Called Up,95,,40,50,70,60,80,98",
+    "Rodri,MF,Spain,Epic,Radiant Blaze,90,80,85,88,95,,85,0"
+)
+
+
+class LoadDataTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_blank_stat_cells_load(self):
+        with mock.patch("pandas.read_csv", wraps=pd.read_csv) as read_csv:
+            at = run_app(CSV)
+
+        self.assertFalse(at.exception)
+        read_csv.assert_called_once()
+        total = next(m for m in at.metric if m.label == "Total Players")
+        self.assertEqual(total.value, "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from tests.support import load_main
+
+main = load_main()
+
+
+def original_power_ranking(row):
+    """The per-player formula compute_power_ranking replaced, verbatim."""
+
+    if row["Pos"] == "GK":
+        power_ranking = (
+            row["PWR"] * 0.40 +
+            row["Goalkeeping"] * 0.30 +
+            row["Explosiveness"] * 0.15 +
+            row["Speed"] * 0.15
+        )
+    else:
+        power_ranking = (
+            row["PWR"] * main.OPTIMAL_WEIGHTS["PWR"] +
+            row["Speed"] * main.OPTIMAL_WEIGHTS["Speed"] +
+            row["Shoot"] * main.OPTIMAL_WEIGHTS["Shoot"] +
+            row["Dribble"] * main.OPTIMAL_WEIGHTS["Dribble"] +
+            row["Pass"] * main.OPTIMAL_WEIGHTS["Pass"] +
+            row["Defend"] * main.OPTIMAL_WEIGHTS["Defend"] +
+            row["Explosiveness"] * main.OPTIMAL_WEIGHTS["Explosiveness"]
+        )
+
+    return round(power_ranking, 2)
+
+
+def players(stats, positions):
+    """A frame shaped like load_data's: float32 stats, categorical Pos."""
+
+    df = pd.DataFrame(np.asarray(stats, dtype=np.float32), columns=main.STAT_COLS)
+    df["Pos"] = pd.Categorical(positions)
+    return df
+
+
+class PowerRankingTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        stats = rng.integers(40, 121, size=(3000, len(main.STAT_COLS)))
+
+        # Exact duplicates, and GKs that differ only in Speed/Explosiveness
+        # (both weighted 0.15), so there are ties across different rows
+        stats[1000:1100] = stats[:100]
+        speed, explosiveness = main.STAT_COLS.index("Speed"), main.STAT_COLS.index("Explosiveness")
+        stats[1100:1200] = stats[200:300]
+        stats[1100:1200, [speed, explosiveness]] = stats[200:300, [explosiveness, speed]]
+
+        positions = rng.choice(["GK", "DF", "MF", "FW"], size=len(stats))
+        positions[200:300] = positions[1100:1200] = "GK"
+
+        self.df = players(stats, positions)
+        self.expected = np.array([
+            original_power_ranking(row)
+            for row in self.df.astype({col: np.float64 for col in main.STAT_COLS}).to_dict("records")
+        ])
+
+    def test_scores_match_row_wise_formula(self):
+        scores = main.compute_power_ranking(self.df)
+
+        self.assertEqual(scores.dtype, np.float64)
+        np.testing.assert_array_equal(scores, self.expected)
+
+    def test_half_cent_rounds_like_builtin(self):
+        # The outfield sum is 95.815 in float64, and 95.815 * 100 is exactly
+        # 9581.5: np.round alone gives 95.82, round(x, 2) gives 95.81
+        df = players([[115, 107, 98, 88, 74, 49, 21, 0]], ["FW"])
+
+        self.assertEqual(np.round(95.815, 2), 95.82)
+        self.assertEqual(main.compute_power_ranking(df)[0], 95.81)
+
+    def test_ranks_match_series_rank(self):
+        scores = main.compute_power_ranking(self.df)
+        order, ranks = main.rank_descending(scores)
+
+        expected = pd.Series(self.expected).rank(ascending=False, method="min").astype(int).to_numpy()
+        np.testing.assert_array_equal(ranks, expected)
+
+        # Highest first, and tied players keep their original row order
+        sorted_scores = scores[order]
+        self.assertTrue((np.diff(sorted_scores) <= 0).all())
+        tied = np.diff(sorted_scores) == 0
+        self.assertTrue(tied.any())
+        self.assertTrue((np.diff(order)[tied] > 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from tests.support import clear_caches, run_app, sheet
+
+RED = "background-color: #FFB6C6"
+
+
+class VerificationTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_match_threshold_uses_exact_scores(self):
+        # 101.31 against the 101.41 target sits just inside the 0.1 match
+        # threshold; float32 noise (101.309998) would push it outside
+        at = run_app(sheet("Luis Diaz,FW,Colombia,Mythical,The Choice,98,92,104,99,91,79,101,0"))
+
+        self.assertFalse(at.exception)
+        row = at.dataframe[0].value.iloc[0]
+        self.assertEqual(row["Calculated"], 101.31)
+        self.assertEqual(row["Difference"], 101.31 - 101.41)
+        self.assertTrue(row["Match"])
+        accuracy = next(m for m in at.metric if m.label == "Accuracy on known players")
+        self.assertEqual(accuracy.value, "100.0%")
+
+    def test_colour_band_uses_exact_scores(self):
+        # 100.91 against 101.41 is a difference of exactly 0.5, which is red;
+        # float32 noise (100.910004) would make it yellow
+        at = run_app(sheet("Luis Diaz,FW,Colombia,Mythical,The Choice,98,86,100,99,95,81,101,0"))
+
+        self.assertFalse(at.exception)
+        row = at.dataframe[0].value.iloc[0]
+        self.assertEqual(row["Difference"], -0.5)
+        self.assertIn(RED, at.dataframe[0].proto.arrow_data.styler.styles)
+
+
+if __name__ == "__main__":
+    unittest.main()